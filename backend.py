@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+
+from typing import List
+import sys
+
+class PySatBackend:
+    def __init__(self, name: str):
+        try:
+            from pysat.solvers import Solver, NoSuchSolverError
+        except ImportError:
+            sys.exit(f"Error: PySAT is not installed, cannot use solver '{name}'. Try --backend dpll or ext:<command>.")
+        try:
+            self._solver = Solver(name=name)
+        except NoSuchSolverError:
+            sys.exit(f"Error: Unknown SAT solver '{name}'. Use a PySAT solver name (Glucose4, Cadical153, ...), dpll or ext:<command>.")
+
+    def add_clause(self, clause: List[int]):
+        self._solver.add_clause(clause)
+
+    def solve(self) -> bool:
+        return self._solver.solve()
+
+    def get_model(self) -> List[int]:
+        return self._solver.get_model()
+
+    def delete(self):
+        self._solver.delete()
+
+class ClauseBufferBackend:
+    def __init__(self):
+        self._clauses = []
+        self._nv = 0
+        self._model = None
+
+    def add_clause(self, clause: List[int]):
+        self._clauses.append(list(clause))
+        for literal in clause:
+            self._nv = max(self._nv, abs(literal))
+
+    def get_model(self) -> List[int]:
+        return self._model
+
+    def to_dimacs(self) -> str:
+        lines = ["p cnf {} {}".format(self._nv, len(self._clauses))]
+        for clause in self._clauses:
+            lines.append(" ".join(map(str, clause)) + " 0")
+        return "\n".join(lines) + "\n"
+
+class ExternalBackend(ClauseBufferBackend):
+    def __init__(self, command: List[str]):
+        super().__init__()
+        self._command = command
+
+    def solve(self) -> bool:
+        import subprocess
+
+        try:
+            proc = subprocess.run(self._command, input=self.to_dimacs(), capture_output=True, text=True)
+        except OSError as e:
+            sys.exit(f"Error: Could not run external solver '{' '.join(self._command)}': {e}")
+
+        status = None
+        values = []
+        for line in proc.stdout.splitlines():
+            parts = line.split()
+            if not parts:
+                continue
+            if parts[0] == "s":
+                status = " ".join(parts[1:])
+            elif parts[0] == "v":
+                values.extend(int(x) for x in parts[1:] if x != "0")
+
+        if status is None:
+            if proc.returncode == 10:
+                status = "SATISFIABLE"
+            elif proc.returncode == 20:
+                status = "UNSATISFIABLE"
+        if status == "UNSATISFIABLE":
+            self._model = None
+            return False
+        if status != "SATISFIABLE":
+            sys.exit(f"Error: External solver '{' '.join(self._command)}' gave no answer (exit code {proc.returncode}).")
+
+        assigned = {abs(x): x for x in values}
+        missing = [v for v in range(1, self._nv + 1) if v not in assigned]
+        if missing:
+            sys.exit(f"Error: External solver '{' '.join(self._command)}' reported SATISFIABLE "
+                     f"but gave no value for {len(missing)} of {self._nv} variables (no 'v' lines?).")
+        self._model = [assigned[v] for v in range(1, self._nv + 1)]
+        return True
+
+class DpllBackend(ClauseBufferBackend):
+    def solve(self) -> bool:
+        import dpll
+
+        instanta = dpll.InstantaSAT()
+        instanta.din_lista_clauze(self._clauses, self._nv)
+        atribuire = dpll.rezolva_dpll(instanta)
+        if atribuire is None:
+            self._model = None
+            return False
+        self._model = [v * semn for v, semn in atribuire.items()]
+        return True
+
+def make_backend(spec: str):
+    if spec == "dpll":
+        return DpllBackend()
+    if spec.startswith("ext:"):
+        import shlex
+        command = shlex.split(spec[len("ext:"):])
+        if not command:
+            sys.exit("Error: 'ext:' needs a command, e.g. ext:kissat.")
+        return ExternalBackend(command)
+    return PySatBackend(spec)
+
+def check_backend(spec: str):
+    backend = make_backend(spec)
+    if isinstance(backend, PySatBackend):
+        backend.delete()
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+
+import hashlib, json, sqlite3, sys, time
+
+DIMENSIUNE_MAXIMA_IMPLICITA = 64 * 1024 * 1024
+RUNDE_RAFINARE = 3
+TIMP_ASTEPTARE = 30.0
+
+def culori_variabile(clauze, variabile):
+    aparitii = {v: [] for v in variabile}
+    for idx_clauza, clauza in enumerate(clauze):
+        for literal in clauza:
+            aparitii[abs(literal)].append((idx_clauza, 1 if literal > 0 else 0))
+
+    culoare = {v: 0 for v in variabile}
+    numar_culori = 1
+    for _ in range(RUNDE_RAFINARE):
+        multiseturi = [tuple(sorted(2 * culoare[abs(l)] + (l > 0) for l in clauza)) for clauza in clauze]
+        rang_clauza = {m: i for i, m in enumerate(sorted(set(multiseturi)))}
+        culoare_clauza = [rang_clauza[m] for m in multiseturi]
+
+        semnaturi = {v: (culoare[v], tuple(sorted((semn, culoare_clauza[idx]) for idx, semn in aparitii[v])))
+                     for v in variabile}
+        distincte = sorted(set(semnaturi.values()))
+        rang = {s: i for i, s in enumerate(distincte)}
+        culoare = {v: rang[semnaturi[v]] for v in variabile}
+        if len(distincte) == numar_culori:
+            break
+        numar_culori = len(distincte)
+    return culoare
+
+def forma_canonica(clauze, num_variabile=0, redenumire=False):
+    clauze = [sorted(set(c)) for c in clauze]
+    variabile = sorted({abs(l) for c in clauze for l in c} | set(range(1, num_variabile + 1)))
+
+    if redenumire:
+        culoare = culori_variabile(clauze, variabile)
+        ordine = sorted(variabile, key=lambda v: (culoare[v], v))
+    else:
+        ordine = variabile
+    permutare = {v: i + 1 for i, v in enumerate(ordine)}
+
+    canonice = sorted({tuple(sorted((permutare[abs(l)] if l > 0 else -permutare[abs(l)]) for l in c)) for c in clauze})
+    text = json.dumps([len(variabile), canonice], separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest(), permutare
+
+class CacheRezultate:
+    def __init__(self, cale, dimensiune_maxima=DIMENSIUNE_MAXIMA_IMPLICITA):
+        self.dimensiune_maxima = dimensiune_maxima
+        self.conexiune = None
+        try:
+            conexiune = sqlite3.connect(cale, timeout=TIMP_ASTEPTARE)
+            conexiune.execute("PRAGMA journal_mode=WAL")
+            conexiune.execute("CREATE TABLE IF NOT EXISTS rezultate ("
+                              "cheie TEXT PRIMARY KEY, valoare TEXT, dimensiune INTEGER, accesat REAL)")
+            conexiune.execute("CREATE TABLE IF NOT EXISTS statistici (nume TEXT PRIMARY KEY, valoare INTEGER)")
+            conexiune.commit()
+            self.conexiune = conexiune
+        except sqlite3.Error as e:
+            print(f"Avertisment: cache-ul '{cale}' nu poate fi folosit ({e}), se continuă fără el.", file=sys.stderr)
+
+    def incrementeaza(self, nume):
+        self.conexiune.execute("INSERT INTO statistici VALUES (?, 1) "
+                               "ON CONFLICT(nume) DO UPDATE SET valoare = valoare + 1", (nume,))
+
+    def cauta(self, tip, cheie):
+        if self.conexiune is None:
+            return None
+        try:
+            rand = self.conexiune.execute("SELECT valoare FROM rezultate WHERE cheie = ?",
+                                          (f"{tip}:{cheie}",)).fetchone()
+            if rand is None:
+                self.incrementeaza("ratari")
+            else:
+                self.conexiune.execute("UPDATE rezultate SET accesat = ? WHERE cheie = ?",
+                                       (time.time(), f"{tip}:{cheie}"))
+                self.incrementeaza("potriviri")
+            self.conexiune.commit()
+        except sqlite3.Error:
+            self.conexiune.rollback()
+            return None
+        return None if rand is None else json.loads(rand[0])
+
+    def salveaza(self, tip, cheie, valoare):
+        if self.conexiune is None:
+            return
+        text = json.dumps(valoare, separators=(",", ":"))
+        try:
+            self.conexiune.execute("INSERT OR REPLACE INTO rezultate VALUES (?, ?, ?, ?)",
+                                   (f"{tip}:{cheie}", text, len(text), time.time()))
+            self.elimina_vechi()
+            self.conexiune.commit()
+        except sqlite3.Error:
+            self.conexiune.rollback()
+
+    def elimina_vechi(self):
+        total = self.conexiune.execute("SELECT COALESCE(SUM(dimensiune), 0) FROM rezultate").fetchone()[0]
+        if total <= self.dimensiune_maxima:
+            return
+        for cheie, dimensiune in self.conexiune.execute(
+                "SELECT cheie, dimensiune FROM rezultate ORDER BY accesat").fetchall():
+            if total <= self.dimensiune_maxima:
+                break
+            self.conexiune.execute("DELETE FROM rezultate WHERE cheie = ?", (cheie,))
+            self.incrementeaza("eliminari")
+            total -= dimensiune
+
+    def statistici(self):
+        intrari, octeti = self.conexiune.execute(
+            "SELECT COUNT(*), COALESCE(SUM(dimensiune), 0) FROM rezultate").fetchone()
+        contoare = dict(self.conexiune.execute("SELECT nume, valoare FROM statistici").fetchall())
+        return {
+            "intrari": intrari,
+            "octeti": octeti,
+            "potriviri": contoare.get("potriviri", 0),
+            "ratari": contoare.get("ratari", 0),
+            "eliminari": contoare.get("eliminari", 0),
+        }
+
+    def raport(self):
+        if self.conexiune is None:
+            return "cache indisponibil"
+        try:
+            s = self.statistici()
+        except sqlite3.Error as e:
+            return f"statistici indisponibile ({e})"
+        cereri = s["potriviri"] + s["ratari"]
+        rata = 100.0 * s["potriviri"] / cereri if cereri else 0.0
+        return (f"{s['intrari']} intrări ({s['octeti']} octeți), {s['potriviri']} potriviri, "
+                f"{s['ratari']} ratări ({rata:.1f}% potriviri), {s['eliminari']} eliminări")
+
+    def inchide(self):
+        if self.conexiune is not None:
+            self.conexiune.close()
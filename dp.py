@@ -1,5 +1,3 @@
-import re
-
 class Unitate:
     def __init__(self, valoare_str):
         self.valoare = valoare_str
@@ -92,6 +90,78 @@ class Clauza:
             return (0, 0)
         return (1, len(self.unitati))
 
+class ClauzaBiti:
+    __slots__ = ('poz', 'neg', '_hash')
+
+    def __init__(self, poz, neg):
+        self.poz = poz
+        self.neg = neg
+        self._hash = hash((poz, neg))
+
+    def e_vida(self):
+        return not (self.poz | self.neg)
+
+    def subsumeaza(self, other):
+        return not (self.poz & ~other.poz) and not (self.neg & ~other.neg)
+
+    def rezolvent(self, other):
+        conflict = (self.poz & other.neg) | (self.neg & other.poz)
+        if not conflict or conflict & (conflict - 1):
+            return None
+        poz = (self.poz | other.poz) & ~conflict
+        neg = (self.neg | other.neg) & ~conflict
+        if poz & neg:
+            return None
+        return poz, neg
+
+    def __eq__(self, other):
+        if not isinstance(other, ClauzaBiti):
+            return NotImplemented
+        return self is other or (self.poz == other.poz and self.neg == other.neg)
+
+    def __hash__(self):
+        return self._hash
+
+class TabelaClauze:
+    def __init__(self):
+        self.index_variabila = {}
+        self.variabile = []
+        self.clauze_internate = {}
+
+    def interneaza(self, poz, neg):
+        cheie = (poz, neg)
+        clauza = self.clauze_internate.get(cheie)
+        if clauza is None:
+            clauza = ClauzaBiti(poz, neg)
+            self.clauze_internate[cheie] = clauza
+        return clauza
+
+    def din_clauza(self, clauza):
+        poz = 0
+        neg = 0
+        for u in clauza.unitati:
+            bit = self.index_variabila.get(u.valoare)
+            if bit is None:
+                bit = len(self.variabile)
+                self.index_variabila[u.valoare] = bit
+                self.variabile.append(u.valoare)
+            if u.negat:
+                neg |= 1 << bit
+            else:
+                poz |= 1 << bit
+        return self.interneaza(poz, neg)
+
+    def in_clauza(self, clauza_biti):
+        unitati = []
+        for masca, negat in ((clauza_biti.poz, False), (clauza_biti.neg, True)):
+            while masca:
+                bit_jos = masca & -masca
+                u = Unitate(self.variabile[bit_jos.bit_length() - 1])
+                u.negat = negat
+                unitati.append(u)
+                masca ^= bit_jos
+        return Clauza(unitati)
+
 class Expresie:
     def __init__(self, clauze):
         self.clauze = [c for c in clauze if not c.is_tautology]
@@ -132,67 +202,66 @@ class Expresie:
 
         return ' /\\ '.join(repr_list)
 
-    def aplica_rezolutie(self):
+    def aplica_rezolutie(self, subsumare=False):
         self.satisfiabila = True
 
-        active_clauses = set(c for c in self.clauze if not c.is_tautology)
+        active_clauses_initiale = [c for c in self.clauze if not c.is_tautology]
 
-        if not active_clauses:
+        if not active_clauses_initiale:
             self.clauze = []
             self.satisfiabila = True
             return
 
-        for clauza in active_clauses:
+        for clauza in active_clauses_initiale:
             if not clauza.unitati:
                 self.satisfiabila = False
-                self.clauze = list(active_clauses)
+                self.clauze = list(set(active_clauses_initiale))
                 return
 
-        iteration_count = 0
-        while True:
-            iteration_count += 1
-            new_resolvents_generated_this_iteration = set()
-
-            list_of_active_clauses = sorted(list(active_clauses), key=lambda c: c.get_canonical_representation_for_sorting())
-            num_active = len(list_of_active_clauses)
-
-            for i in range(num_active):
-                ci = list_of_active_clauses[i]
-                if not ci.unitati: continue
-
-                for j in range(i + 1, num_active):
-                    cj = list_of_active_clauses[j]
-                    if not cj.unitati: continue
+        tabela = TabelaClauze()
+        active_clauses = set(tabela.din_clauza(c) for c in active_clauses_initiale)
+        clauze_noi = list(active_clauses)
+        aparitii_poz = {}
+        aparitii_neg = {}
 
-                    for idx_u1_ci, u1_ci in enumerate(ci.unitati):
-                        for idx_u2_cj, u2_cj in enumerate(cj.unitati):
-                            if u1_ci.valoare == u2_cj.valoare and u1_ci.negat != u2_cj.negat:
-                                potential_new_clause_units = []
-                                for k_ci, unit_in_ci in enumerate(ci.unitati):
-                                    if k_ci != idx_u1_ci:
-                                        potential_new_clause_units.append(unit_in_ci)
-
-                                for k_cj, unit_in_cj in enumerate(cj.unitati):
-                                    if k_cj != idx_u2_cj:
-                                        potential_new_clause_units.append(unit_in_cj)
-
-                                resolvent = Clauza(potential_new_clause_units)
-
-                                if not resolvent.unitati and not resolvent.is_tautology:
-                                    self.satisfiabila = False
-                                    active_clauses.add(resolvent)
-                                    self.clauze = list(active_clauses)
-                                    return
-
-                                if not resolvent.is_tautology and resolvent not in active_clauses:
-                                    new_resolvents_generated_this_iteration.add(resolvent)
-
-            if not new_resolvents_generated_this_iteration:
-                self.clauze = list(active_clauses)
-                return
+        while clauze_noi:
+            new_resolvents_generated_this_iteration = set()
 
+            for ci in clauze_noi:
+                for masca, aparitii_opuse in ((ci.poz, aparitii_neg), (ci.neg, aparitii_poz)):
+                    while masca:
+                        bit_jos = masca & -masca
+                        masca ^= bit_jos
+                        for cj in aparitii_opuse.get(bit_jos, ()):
+                            rezultat = ci.rezolvent(cj)
+                            if rezultat is None:
+                                continue
+
+                            resolvent = tabela.interneaza(*rezultat)
+
+                            if resolvent.e_vida():
+                                self.satisfiabila = False
+                                active_clauses.add(resolvent)
+                                self.clauze = [tabela.in_clauza(c) for c in active_clauses]
+                                return
+
+                            if resolvent in active_clauses or resolvent in new_resolvents_generated_this_iteration:
+                                continue
+                            if subsumare and any(c.subsumeaza(resolvent) for c in active_clauses):
+                                continue
+                            new_resolvents_generated_this_iteration.add(resolvent)
+
+                for masca, aparitii in ((ci.poz, aparitii_poz), (ci.neg, aparitii_neg)):
+                    while masca:
+                        bit_jos = masca & -masca
+                        masca ^= bit_jos
+                        aparitii.setdefault(bit_jos, []).append(ci)
+
+            clauze_noi = list(new_resolvents_generated_this_iteration)
             active_clauses.update(new_resolvents_generated_this_iteration)
 
+        self.clauze = [tabela.in_clauza(c) for c in active_clauses]
+
 
 def citeste_clauze_fisier(nume_fisier):
     clauze_obiecte = []
@@ -261,8 +330,24 @@ def citeste_clauze_fisier(nume_fisier):
         return None
     return clauze_obiecte
 
-if __name__ == "__main__":
-    cnf_file_to_process = "test.cnf"
+def preproceseaza_clauze(clauze):
+    from preprocesare import preproceseaza
+
+    simplificare = preproceseaza([[-int(u.valoare) if u.negat else int(u.valoare) for u in c.unitati]
+                                  for c in clauze if not c.is_tautology])
+    print(f"Preprocesare: {simplificare.tiparibil_sumar()}")
+
+    clauze_noi = []
+    for literali in simplificare.clauze:
+        unitati = []
+        for literal in literali:
+            u = Unitate(str(abs(literal)))
+            u.negat = literal < 0
+            unitati.append(u)
+        clauze_noi.append(Clauza(unitati))
+    return clauze_noi
+
+def principal(cnf_file_to_process, preprocesare=False, subsumare=False):
 
     print(f"--- Procesare fișier: {cnf_file_to_process} ---")
     clauze_citite = citeste_clauze_fisier(cnf_file_to_process)
@@ -273,6 +358,10 @@ if __name__ == "__main__":
         num_clauses_read = len(clauze_citite)
         print(f"Au fost citite {num_clauses_read} clauze.")
 
+        if preprocesare and clauze_citite:
+            clauze_citite = preproceseaza_clauze(clauze_citite)
+            num_clauses_read = len(clauze_citite)
+
         if num_clauses_read == 0 and not any(line.strip() and not line.strip().startswith('c') and not line.strip().startswith('p') for line in open(cnf_file_to_process)):
             print("Fișierul nu conține clauze valide sau este gol. Se consideră satisfiabil.")
             expresie_obj = Expresie([])
@@ -286,7 +375,7 @@ if __name__ == "__main__":
         if expresie_obj.satisfiabila is None:
             print("\nAplicare rezoluție...")
             try:
-                expresie_obj.aplica_rezolutie()
+                expresie_obj.aplica_rezolutie(subsumare)
             except Exception as e:
                 print(f"EROARE în timpul expresie_obj.aplica_rezolutie(): {e}")
                 import traceback
@@ -295,4 +384,20 @@ if __name__ == "__main__":
         print("\nRezultat final:")
         expresie_obj.tipareste(show_clauses=True)
     else:
-        print(f"Procesarea fișierului {cnf_file_to_process} a eșuat sau fișierul nu conține clauze valide.")
\ No newline at end of file
+        print(f"Procesarea fișierului {cnf_file_to_process} a eșuat sau fișierul nu conține clauze valide.")
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rezoluție pe o formulă CNF în format DIMACS.")
+    parser.add_argument("fisier", nargs="?", default="test.cnf")
+    parser.add_argument("-p", "--preprocesare", action="store_true",
+                        help="simplifică formula pe graful de implicații binare înainte de rezoluție")
+    parser.add_argument("--subsumare", action="store_true",
+                        help="renunță la rezolvenții subsumați de o clauză existentă; mult mai rapid, "
+                             "dar mulțimea de clauze afișată la final diferă (satisfiabilitatea nu)")
+    args = parser.parse_args(argv)
+    principal(args.fisier, args.preprocesare, args.subsumare)
+
+if __name__ == "__main__":
+    main()
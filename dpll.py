@@ -1,10 +1,6 @@
 #!/usr/bin/python3
 
-import random
 import sys
-import time
-import copy
-from collections import OrderedDict
 
 class Clauza:
     def __init__(self):
@@ -84,6 +80,22 @@ class InstantaSAT:
             print(f"Eroare la citirea fișierului '{cale_fisier}': {e}", file=sys.stderr)
             sys.exit(1)
 
+        self.stabileste_variabile_declarate()
+
+    def din_lista_clauze(self, lista_clauze_int, num_variabile=0):
+        self.variabile_declarate_index = []
+        self.clauze = []
+        self.num_variabile_din_header = num_variabile
+
+        for literali_clauza in lista_clauze_int:
+            if literali_clauza:
+                clauza_noua = Clauza()
+                clauza_noua.din_lista_literali(literali_clauza)
+                self.clauze.append(clauza_noua)
+
+        self.stabileste_variabile_declarate()
+
+    def stabileste_variabile_declarate(self):
         if self.num_variabile_din_header > 0:
             self.variabile_declarate_index = list(range(1, self.num_variabile_din_header + 1))
         else:
@@ -115,158 +127,298 @@ class InstantaSAT:
                         break 
             if not clauza_este_adevarata:
                 return False 
-        return True 
-
-    def gaseste_clauza_unitara(self):
-        for clauza_obj in self.clauze:
-            if len(clauza_obj.simboluri) == 1:
-                index_variabila = next(iter(clauza_obj.simboluri.keys()))
-                semn = next(iter(clauza_obj.simboluri.values()))
-                return {index_variabila: semn}
-        return None 
-
-    def nu_exista_clauza_unitara_opusa(self, clauza_unitara_dict):
-        index_variabila_referinta = next(iter(clauza_unitara_dict.keys()))
-        semn_referinta = next(iter(clauza_unitara_dict.values()))
-
-        for clauza_obj in self.clauze:
-            if len(clauza_obj.simboluri) == 1:
-                index_variabila_curent = next(iter(clauza_obj.simboluri.keys()))
-                semn_curent = next(iter(clauza_obj.simboluri.values()))
-                if index_variabila_curent == index_variabila_referinta and semn_curent != semn_referinta:
-                    return False 
-        return True 
-
-    def simplifica(self, clauza_unitara_dict):
-        index_var_propagat = next(iter(clauza_unitara_dict.keys()))
-        semn_propagat = next(iter(clauza_unitara_dict.values()))
-        
-        clauze_noi = []
-        conflict_detectat = False
+        return True
+
+class StareCautare:
+    def __init__(self, instanta):
+        self.n = instanta.num_variabile_din_header
+        for clauza_obj in instanta.clauze:
+            for index_variabila in clauza_obj.simboluri:
+                self.n = max(self.n, index_variabila)
+        n = self.n
+
+        self.clauze = [[v * semn for v, semn in clauza_obj.simboluri.items()] for clauza_obj in instanta.clauze]
+        self.valoare = [0] * (n + 1)
+        self.aparitii = [[] for _ in range(2 * n + 1)]
+        self.contor = [0] * (2 * n + 1)
+        self.nr_adevarati = [0] * len(self.clauze)
+        self.nr_libere = [len(c) for c in self.clauze]
+        self.nr_nesatisfacute = len(self.clauze)
+        self.traseu = []
+        self.coada_unitare = []
+        self.coada_puri = list(range(1, n + 1))
+        self.conflict = any(not c for c in self.clauze)
+
+        for idx_clauza, clauza in enumerate(self.clauze):
+            for literal in clauza:
+                self.aparitii[n + literal].append(idx_clauza)
+                self.contor[n + literal] += 1
+            if len(clauza) == 1:
+                self.coada_unitare.append(idx_clauza)
+
+        self.decizii = 0
+        self.propagari = 0
+        self.literali_puri = 0
+        self.conflicte = 0
+
+    def atribuie(self, literal):
+        n = self.n
+        valoare = self.valoare
+        contor = self.contor
+        valoare[abs(literal)] = 1 if literal > 0 else -1
+        self.traseu.append(literal)
+
+        for idx_clauza in self.aparitii[n + literal]:
+            self.nr_adevarati[idx_clauza] += 1
+            self.nr_libere[idx_clauza] -= 1
+            if self.nr_adevarati[idx_clauza] == 1:
+                self.nr_nesatisfacute -= 1
+                contor[n + literal] -= 1
+                for alt_literal in self.clauze[idx_clauza]:
+                    if valoare[abs(alt_literal)] == 0:
+                        contor[n + alt_literal] -= 1
+                        if contor[n + alt_literal] == 0:
+                            self.coada_puri.append(abs(alt_literal))
+
+        for idx_clauza in self.aparitii[n - literal]:
+            self.nr_libere[idx_clauza] -= 1
+            if self.nr_adevarati[idx_clauza] == 0:
+                contor[n - literal] -= 1
+                if self.nr_libere[idx_clauza] == 0:
+                    self.conflict = True
+                elif self.nr_libere[idx_clauza] == 1:
+                    self.coada_unitare.append(idx_clauza)
+
+    def anuleaza_pana_la(self, lungime_traseu):
+        n = self.n
+        valoare = self.valoare
+        contor = self.contor
+        while len(self.traseu) > lungime_traseu:
+            literal = self.traseu.pop()
+
+            for idx_clauza in self.aparitii[n - literal]:
+                self.nr_libere[idx_clauza] += 1
+                if self.nr_adevarati[idx_clauza] == 0:
+                    contor[n - literal] += 1
+
+            for idx_clauza in self.aparitii[n + literal]:
+                self.nr_adevarati[idx_clauza] -= 1
+                self.nr_libere[idx_clauza] += 1
+                if self.nr_adevarati[idx_clauza] == 0:
+                    self.nr_nesatisfacute += 1
+                    contor[n + literal] += 1
+                    for alt_literal in self.clauze[idx_clauza]:
+                        if valoare[abs(alt_literal)] == 0:
+                            contor[n + alt_literal] += 1
+
+            valoare[abs(literal)] = 0
+
+        self.coada_unitare = []
+        self.coada_puri = []
+        self.conflict = False
+
+    def literal_liber(self, idx_clauza):
+        for literal in self.clauze[idx_clauza]:
+            if self.valoare[abs(literal)] == 0:
+                return literal
+        return None
 
-        for clauza_obj in self.clauze:
-            if index_var_propagat in clauza_obj.simboluri:
-                if clauza_obj.simboluri[index_var_propagat] == semn_propagat:
-                    continue 
-                else: 
-                    clauza_modificata = Clauza()
-                    clauza_modificata.simboluri = clauza_obj.simboluri.copy()
-                    del clauza_modificata.simboluri[index_var_propagat]
-                    if not clauza_modificata.simboluri: 
-                        conflict_detectat = True
-                        break 
-                    clauze_noi.append(clauza_modificata)
+    def propaga(self):
+        while not self.conflict:
+            if self.coada_unitare:
+                idx_clauza = self.coada_unitare.pop()
+                if self.nr_adevarati[idx_clauza] > 0:
+                    continue
+                literal = self.literal_liber(idx_clauza)
+                if literal is None:
+                    self.conflict = True
+                    break
+                self.propagari += 1
+                self.atribuie(literal)
+            elif self.coada_puri:
+                v = self.coada_puri.pop()
+                if self.valoare[v] != 0:
+                    continue
+                pozitiv, negativ = self.contor[self.n + v], self.contor[self.n - v]
+                if pozitiv > 0 and negativ == 0:
+                    self.literali_puri += 1
+                    self.atribuie(v)
+                elif negativ > 0 and pozitiv == 0:
+                    self.literali_puri += 1
+                    self.atribuie(-v)
             else:
-                clauze_noi.append(clauza_obj)
-        
-        if conflict_detectat:
-            self.clauze = [Clauza()] 
-        
-        else:
-            self.clauze = clauze_noi
-        return self
-
-def rezolva_dpll(instanta_initiala):
-    instanta_de_lucru = copy.deepcopy(instanta_initiala)
-    atribuire_rezultat = dpll_recursiv(instanta_de_lucru, {})
+                break
+        return not self.conflict
+
+    def alege_literal(self):
+        cel_mai_bun = None
+        scor_maxim = -1
+        for v in range(1, self.n + 1):
+            if self.valoare[v] != 0:
+                continue
+            pozitiv, negativ = self.contor[self.n + v], self.contor[self.n - v]
+            if pozitiv + negativ > scor_maxim:
+                scor_maxim = pozitiv + negativ
+                cel_mai_bun = v if pozitiv >= negativ else -v
+        return cel_mai_bun
+
+    def tiparibil_sumar(self):
+        return (f"{self.decizii} decizii, {self.propagari} propagări, "
+                f"{self.literali_puri} literali puri, {self.conflicte} conflicte")
+
+    def cauta(self):
+        niveluri = []
+        while True:
+            if self.propaga():
+                if self.nr_nesatisfacute == 0:
+                    return {v: self.valoare[v] for v in range(1, self.n + 1) if self.valoare[v] != 0}
+                literal = self.alege_literal()
+                self.decizii += 1
+                niveluri.append((len(self.traseu), literal, False))
+                self.atribuie(literal)
+                continue
+
+            self.conflicte += 1
+            while niveluri:
+                lungime_traseu, literal, inversat = niveluri.pop()
+                self.anuleaza_pana_la(lungime_traseu)
+                if not inversat:
+                    niveluri.append((lungime_traseu, -literal, True))
+                    self.atribuie(-literal)
+                    break
+            else:
+                return None
+
+def verifica_model(instanta, atribuire):
+    if atribuire is not None and not instanta.este_satisfacuta(atribuire):
+        raise RuntimeError("model invalid: atribuirea găsită nu satisface formula")
+    return atribuire
+
+def rezolva_dpll(instanta_initiala, statistici=None, preprocesare=False, verifica=False):
+    instanta_de_lucru = instanta_initiala
+    simplificare = None
+    if preprocesare:
+        from preprocesare import preproceseaza
+
+        simplificare = preproceseaza([[v * semn for v, semn in c.simboluri.items()] for c in instanta_initiala.clauze])
+        if statistici is not None:
+            statistici["preprocesare"] = simplificare.tiparibil_sumar()
+        if simplificare.nesatisfiabil:
+            return None
+        instanta_de_lucru = InstantaSAT()
+        instanta_de_lucru.din_lista_clauze(simplificare.clauze, instanta_initiala.num_variabile_din_header)
+
+    stare = StareCautare(instanta_de_lucru)
+    atribuire_rezultat = stare.cauta()
+    if statistici is not None:
+        statistici["sumar"] = stare.tiparibil_sumar()
     
     if atribuire_rezultat is not None:
+        if simplificare is not None:
+            atribuire_rezultat = simplificare.reconstruieste_model(atribuire_rezultat)
         atribuire_completa = atribuire_rezultat.copy()
         for var_idx in instanta_initiala.variabile_declarate_index:
             if var_idx not in atribuire_completa:
                 atribuire_completa[var_idx] = 1 
         
-        atribuire_sortata = dict(OrderedDict(sorted(atribuire_completa.items())))
-        return atribuire_sortata
+        atribuire_sortata = dict(sorted(atribuire_completa.items()))
+        return verifica_model(instanta_initiala, atribuire_sortata) if verifica else atribuire_sortata
     else:
         return None
 
+def rezolva_cu_cache(instanta, cache, statistici=None, preprocesare=False, redenumire=False, verifica=False):
+    from cache import forma_canonica
+
+    cheie, permutare = forma_canonica([[v * semn for v, semn in c.simboluri.items()] for c in instanta.clauze],
+                                      redenumire=redenumire)
+    rezultat = cache.cauta("dpll", cheie)
+    if rezultat is not None:
+        if not rezultat["satisfiabil"]:
+            return None
+        inversa = {canonic: v for v, canonic in permutare.items()}
+        atribuire = {inversa[abs(l)]: (1 if l > 0 else -1) for l in rezultat["model"]}
+        for var_idx in instanta.variabile_declarate_index:
+            atribuire.setdefault(var_idx, 1)
+        atribuire = dict(sorted(atribuire.items()))
+        return verifica_model(instanta, atribuire) if verifica else atribuire
+
+    atribuire = rezolva_dpll(instanta, statistici, preprocesare, verifica)
+    if atribuire is None:
+        cache.salveaza("dpll", cheie, {"satisfiabil": False})
+    else:
+        model = sorted(permutare[v] * semn for v, semn in atribuire.items() if v in permutare)
+        cache.salveaza("dpll", cheie, {"satisfiabil": True, "model": model})
+    return atribuire
 
-def dpll_recursiv(instanta, atribuire_curenta):
-    if not instanta.clauze:
-        return atribuire_curenta
-
-  
-    while True:
-        clauza_unit = instanta.gaseste_clauza_unitara()
-        if not clauza_unit:
-            break 
-
-        if instanta.nu_exista_clauza_unitara_opusa(clauza_unit) == False:
-            return None 
-        
-        simbol_idx_unitar = next(iter(clauza_unit.keys()))
-        semn_unitar = next(iter(clauza_unit.values()))
-
-   
-        if simbol_idx_unitar in atribuire_curenta and atribuire_curenta[simbol_idx_unitar] != semn_unitar:
-            return None 
-
-        atribuire_curenta[simbol_idx_unitar] = semn_unitar
-        instanta.simplifica(clauza_unit)
-
-        if not instanta.clauze:
-            return atribuire_curenta
-        if any(not cl.simboluri for cl in instanta.clauze):
-            return None 
-
-    variabila_aleasa = None
-    for var_idx_potential in instanta.variabile_declarate_index: 
-        if var_idx_potential not in atribuire_curenta:
-            variabila_aleasa = var_idx_potential
-            break
-    
-    if variabila_aleasa is None:
+def scrie_atribuire(fisier_iesire, atribuire):
+    if atribuire is not None:
      
-        return None 
-
- 
-    for semn_ales in [1, -1]:
-        instanta_copie_ramura = copy.deepcopy(instanta)
-        atribuire_copie_ramura = atribuire_curenta.copy()
+        tokens_atribuire = []
+        for index_variabila, semn in atribuire.items():
+            token = ""
+            if semn == -1:
+                token += "-"
+            token += str(index_variabila)
+            tokens_atribuire.append(token)
+        fisier_iesire.write(" ".join(tokens_atribuire) + "\n")
+    else:
         
-        dict_variabila_aleasa = {variabila_aleasa: semn_ales}
-   
-        atribuire_copie_ramura[variabila_aleasa] = semn_ales
-        instanta_copie_ramura.simplifica(dict_variabila_aleasa)
-
- 
-        if any(not cl.simboluri for cl in instanta_copie_ramura.clauze):
-            continue 
-
-        rezultat_recursiv = dpll_recursiv(instanta_copie_ramura, atribuire_copie_ramura)
-        if rezultat_recursiv is not None:
-            return rezultat_recursiv
-            
-    return None
-						
-def principal(cale_fisier_input):
+        fisier_iesire.write("UNSATISFIABLE\n")
+
+def principal(cale_fisier_input, cale_fisier_iesire="assignments.txt", afiseaza_statistici=False, preprocesare=False,
+              cale_cache=None, redenumire=False, dimensiune_cache=None, verifica=False):
     instanta = InstantaSAT()
     instanta.incarca_din_fisier_dimacs(cale_fisier_input)
     
    
-
-    atribuire = rezolva_dpll(instanta)
+    statistici = {}
+    if cale_cache:
+        from cache import CacheRezultate, DIMENSIUNE_MAXIMA_IMPLICITA
+
+        cache = CacheRezultate(cale_cache, dimensiune_cache or DIMENSIUNE_MAXIMA_IMPLICITA)
+        atribuire = rezolva_cu_cache(instanta, cache, statistici, preprocesare, redenumire, verifica)
+        statistici["cache"] = cache.raport()
+        cache.inchide()
+    else:
+        atribuire = rezolva_dpll(instanta, statistici, preprocesare, verifica)
+    if afiseaza_statistici:
+        if "preprocesare" in statistici:
+            print(f"Preprocesare: {statistici['preprocesare']}", file=sys.stderr)
+        if "sumar" in statistici:
+            print(f"Statistici: {statistici['sumar']}", file=sys.stderr)
+        if "cache" in statistici:
+            print(f"Cache: {statistici['cache']}", file=sys.stderr)
     
-    with open("assignments.txt", "w") as fisier_iesire:
-        if atribuire is not None:
-         
-            tokens_atribuire = []
-            for index_variabila, semn in atribuire.items():
-                token = ""
-                if semn == -1:
-                    token += "-"
-                token += str(index_variabila)
-                tokens_atribuire.append(token)
-            fisier_iesire.write(" ".join(tokens_atribuire) + "\n")
-        else:
-            
-            fisier_iesire.write("UNSATISFIABLE\n")
+    if cale_fisier_iesire == "-":
+        scrie_atribuire(sys.stdout, atribuire)
+        sys.stdout.flush()
+        return
+
+    with open(cale_fisier_iesire, "w") as fisier_iesire:
+        scrie_atribuire(fisier_iesire, atribuire)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="DPLL pe o formulă CNF în format DIMACS.")
+    parser.add_argument("fisier", nargs="?", default="test.cnf")
+    parser.add_argument("-o", "--iesire", default="assignments.txt",
+                        help="fișierul în care se scrie atribuirea ('-' pentru stdout)")
+    parser.add_argument("-s", "--statistici", action="store_true",
+                        help="afișează pe stderr decizii, propagări, literali puri și conflicte")
+    parser.add_argument("-p", "--preprocesare", action="store_true",
+                        help="simplifică formula pe graful de implicații binare înainte de căutare")
+    parser.add_argument("--cache", metavar="FISIER",
+                        help="bază SQLite cu rezultate deja calculate, indexată după forma canonică a formulei")
+    parser.add_argument("--cache-redenumire", action="store_true",
+                        help="recunoaște în cache și formulele care diferă doar prin numele variabilelor (cheie mai scumpă)")
+    parser.add_argument("--cache-dimensiune", type=int, metavar="OCTETI",
+                        help="dimensiunea maximă a cache-ului; intrările folosite cel mai demult se elimină (implicit 64 MiB)")
+    parser.add_argument("--verifica", action="store_true",
+                        help="depanare: verifică modelul găsit pe formula inițială și oprește cu eroare dacă nu o satisface")
+    args = parser.parse_args(argv)
+    principal(args.fisier, args.iesire, args.statistici, args.preprocesare, args.cache, args.cache_redenumire,
+              args.cache_dimensiune, args.verifica)
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        nume_fisier = sys.argv[1]
-        principal(nume_fisier)
-    else:
-       
-        principal("test.cnf")
\ No newline at end of file
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/python3
+
+import sys
+
+COMMANDS = {
+    "dpll": "dpll",
+    "resolution": "dp",
+    "treedepth": "rez",
+}
+
+USAGE = """usage: mai_sat.py [--worker] {dpll,resolution,treedepth} [args ...]
+
+  dpll        DPLL on a DIMACS CNF (dpll.py)
+  resolution  resolution on a DIMACS CNF (dp.py)
+  treedepth   treedepth of the primal graph of a DIMACS CNF (rez.py)
+
+  --worker    keep the interpreter warm: read one CNF path per line from
+              stdin and run the subcommand on each, printing 'c done <path>'
+              after every file (use 'dpll -o -' to print assignments)"""
+
+def load(command: str):
+    import importlib
+
+    return importlib.import_module(COMMANDS[command])
+
+def run_worker(module, argv):
+    for line in sys.stdin:
+        path = line.strip()
+        if not path:
+            continue
+        try:
+            module.main(argv + [path])
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                print(e.code if isinstance(e.code, str) else f"Error: exit code {e.code}", file=sys.stderr)
+        except Exception as e:
+            print(f"Error while processing '{path}': {e}", file=sys.stderr)
+        print(f"c done {path}")
+        sys.stdout.flush()
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    worker = False
+    if argv and argv[0] == "--worker":
+        worker = True
+        argv = argv[1:]
+
+    if not argv or argv[0] not in COMMANDS:
+        sys.exit(USAGE)
+
+    module = load(argv[0])
+    if worker:
+        run_worker(module, argv[1:])
+    else:
+        module.main(argv[1:])
+
+if __name__ == '__main__':
+    main()
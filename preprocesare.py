@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+
+BITI_PE_TRECERE = 4096
+
+class Preprocesare:
+    def __init__(self, clauze):
+        self.clauze = [sorted(set(c)) for c in clauze]
+        self.clauze = [c for c in self.clauze if not any(-l in c for l in c if l > 0)]
+        self.nesatisfiabil = any(not c for c in self.clauze)
+        self.unitati = {}
+        self.substitutii = []
+        self.literali_esuati = 0
+        self.modificate = None
+
+    def propaga_unitati(self):
+        while not self.nesatisfiabil:
+            unitati_noi = {}
+            for clauza in self.clauze:
+                if len(clauza) == 1:
+                    literal = clauza[0]
+                    if unitati_noi.get(abs(literal), literal) != literal:
+                        self.nesatisfiabil = True
+                        return
+                    unitati_noi[abs(literal)] = literal
+            if not unitati_noi:
+                return
+
+            for v, literal in unitati_noi.items():
+                self.unitati[v] = 1 if literal > 0 else -1
+            adevarati = set(unitati_noi.values())
+            clauze_noi = []
+            for clauza in self.clauze:
+                if any(l in adevarati for l in clauza):
+                    self.marcheaza(clauza)
+                    continue
+                rest = [l for l in clauza if -l not in adevarati]
+                if not rest:
+                    self.nesatisfiabil = True
+                    return
+                if len(rest) < len(clauza):
+                    self.marcheaza(clauza)
+                clauze_noi.append(rest)
+            self.clauze = clauze_noi
+
+    def marcheaza(self, clauza):
+        if self.modificate is not None:
+            self.modificate.update(abs(l) for l in clauza)
+
+    def graf_implicatii(self):
+        graf = {}
+        for clauza in self.clauze:
+            if len(clauza) == 2:
+                a, b = clauza
+                graf.setdefault(-a, []).append(b)
+                graf.setdefault(-b, []).append(a)
+                graf.setdefault(a, [])
+                graf.setdefault(b, [])
+        return graf
+
+    def componente_tari(self, graf):
+        index = {}
+        low = {}
+        pe_stiva = set()
+        stiva = []
+        componente = []
+        contor = 0
+
+        for start in graf:
+            if start in index:
+                continue
+            index[start] = low[start] = contor
+            contor += 1
+            stiva.append(start)
+            pe_stiva.add(start)
+            drum = [(start, iter(graf[start]))]
+            while drum:
+                nod, succesori = drum[-1]
+                avansat = False
+                for urmator in succesori:
+                    if urmator not in index:
+                        index[urmator] = low[urmator] = contor
+                        contor += 1
+                        stiva.append(urmator)
+                        pe_stiva.add(urmator)
+                        drum.append((urmator, iter(graf[urmator])))
+                        avansat = True
+                        break
+                    if urmator in pe_stiva:
+                        low[nod] = min(low[nod], index[urmator])
+                if avansat:
+                    continue
+
+                drum.pop()
+                if drum:
+                    parinte = drum[-1][0]
+                    low[parinte] = min(low[parinte], low[nod])
+                if low[nod] == index[nod]:
+                    componenta = []
+                    while True:
+                        w = stiva.pop()
+                        pe_stiva.discard(w)
+                        componenta.append(w)
+                        if w == nod:
+                            break
+                    componente.append(componenta)
+        return componente
+
+    def substituie_echivalenti(self, graf):
+        inlocuire = {}
+        for componenta in self.componente_tari(graf):
+            if len(componenta) < 2:
+                continue
+            literali = set(componenta)
+            if any(-l in literali for l in literali):
+                self.nesatisfiabil = True
+                return False
+            reprezentant = min(componenta, key=abs)
+            for literal in componenta:
+                if literal != reprezentant and literal > 0:
+                    inlocuire[literal] = reprezentant
+                elif literal != reprezentant:
+                    inlocuire[-literal] = -reprezentant
+
+        if not inlocuire:
+            return False
+
+        for v, reprezentant in inlocuire.items():
+            self.substitutii.append((v, reprezentant))
+
+        clauze_noi = []
+        for clauza in self.clauze:
+            if not any(abs(l) in inlocuire for l in clauza):
+                clauze_noi.append(clauza)
+                continue
+            noua = set()
+            for literal in clauza:
+                if abs(literal) in inlocuire:
+                    literal = inlocuire[abs(literal)] if literal > 0 else -inlocuire[abs(literal)]
+                noua.add(literal)
+            self.marcheaza(noua)
+            if any(-l in noua for l in noua):
+                continue
+            clauze_noi.append(sorted(noua))
+        self.clauze = clauze_noi
+        return True
+
+    def literali_de_sondat(self, graf):
+        if self.modificate is None:
+            return sorted(graf, key=lambda l: (abs(l), l))
+
+        predecesori = {}
+        for literal, succesori in graf.items():
+            for urmator in succesori:
+                predecesori.setdefault(urmator, []).append(literal)
+        coada = [l for v in self.modificate for l in (v, -v) if l in graf]
+        vazuti = set(coada)
+        for curent in coada:
+            for anterior in predecesori.get(curent, ()):
+                if anterior not in vazuti:
+                    vazuti.add(anterior)
+                    coada.append(anterior)
+        return sorted(vazuti, key=lambda l: (abs(l), l))
+
+    def literali_esuati_din(self, graf, candidati):
+        componente = self.componente_tari(graf)
+        esuati = set()
+        for inceput in range(0, len(candidati), BITI_PE_TRECERE):
+            felie = candidati[inceput:inceput + BITI_PE_TRECERE]
+            bit = {-l: 1 << i for i, l in enumerate(felie)}
+            atinsi = {}
+            for componenta in componente:
+                masca = 0
+                for literal in componenta:
+                    masca |= bit.get(literal, 0)
+                    for urmator in graf[literal]:
+                        masca |= atinsi.get(urmator, 0)
+                for literal in componenta:
+                    atinsi[literal] = masca
+            esuati.update(l for i, l in enumerate(felie) if atinsi[l] >> i & 1)
+        return esuati
+
+    def sondeaza(self, graf):
+        esuati = self.literali_esuati_din(graf, self.literali_de_sondat(graf))
+        self.modificate = set()
+        if any(-l in esuati for l in esuati):
+            self.nesatisfiabil = True
+            return False
+
+        self.literali_esuati += len(esuati)
+        for literal in esuati:
+            self.clauze.append([-literal])
+        return bool(esuati)
+
+    def ruleaza(self):
+        while not self.nesatisfiabil:
+            self.propaga_unitati()
+            if self.nesatisfiabil:
+                break
+            graf = self.graf_implicatii()
+            if self.substituie_echivalenti(graf):
+                continue
+            if self.nesatisfiabil:
+                break
+            if not self.sondeaza(graf):
+                break
+        if self.nesatisfiabil:
+            self.clauze = [[]]
+        return self
+
+    def reconstruieste_model(self, atribuire):
+        model = dict(atribuire)
+        model.update(self.unitati)
+        for v, reprezentant in reversed(self.substitutii):
+            valoare = model.get(abs(reprezentant), 1)
+            model[v] = valoare if reprezentant > 0 else -valoare
+        return model
+
+    def tiparibil_sumar(self):
+        return (f"{len(self.unitati)} unități, {len(self.substitutii)} variabile substituite, "
+                f"{self.literali_esuati} literali eșuați, {len(self.clauze)} clauze rămase")
+
+def preproceseaza(clauze):
+    return Preprocesare(clauze).ruleaza()
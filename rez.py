@@ -1,15 +1,15 @@
 #!/usr/bin/python3
 
 from typing import List
-import sys, itertools
-from pysat.solvers import Solver
-from pysat.formula import CNF as PySatCNF
+import sys
+from backend import check_backend, make_backend
 
 class Instance:
-    def __init__(self, n: int, m: int, adj):
+    def __init__(self, n: int, m: int, indptr, indices):
         self._n = n
         self._m = m
-        self._adj = adj
+        self._indptr = indptr
+        self._indices = indices
 
     def vertex_number(self) -> int:
         return self._n
@@ -18,7 +18,7 @@ class Instance:
         return self._m
 
     def adj(self, v) -> List[int]:
-        return self._adj[v]
+        return self._indices[self._indptr[v]:self._indptr[v + 1]].tolist()
 
     def edges(self):
         for v in range(self.vertex_number()):
@@ -46,83 +46,147 @@ class Result:
     def __repr__(self):
         return "Result({}, {})".format(self.depth(), self._parents)
 
+def read_formula(filepath: str):
+    num_vars = 0
+    clauses = []
+    current = []
+    with open(filepath, "r") as f:
+        for line in f:
+            if line.lstrip()[:1] in ("", "c", "p", "%"):
+                continue
+            parts = line.split()
+            for token in parts:
+                literal = int(token)
+                if literal == 0:
+                    clauses.append(current)
+                    current = []
+                else:
+                    num_vars = max(num_vars, abs(literal))
+                    current.append(literal)
+    if current:
+        clauses.append(current)
+    return num_vars, clauses
+
 def read_instance(filepath: str) -> Instance:
     try:
-        formula = PySatCNF(from_file=filepath)
-    except Exception as e:
-        sys.exit(f"Eroare la parsarea fișierului CNF '{filepath}' cu PySAT: {e}")
-        
-    num_vars = formula.nv 
-    
-    if num_vars == 0 and not formula.clauses:
-       
-         return Instance(0, 0, [])
-
-
-    adj = [set() for _ in range(num_vars)]
-
-    for clause in formula.clauses:
-        current_clause_vars = []
-        for literal in clause:
-            abs_var = abs(literal)
-            if 1 <= abs_var <= num_vars:
-                current_clause_vars.append(abs_var - 1) 
-     
-        
-        unique_vars_in_clause = sorted(list(set(current_clause_vars)))
-        
-        for i in range(len(unique_vars_in_clause)):
-            for j in range(i + 1, len(unique_vars_in_clause)):
-                u, v = unique_vars_in_clause[i], unique_vars_in_clause[j]
-                adj[u].add(v)
-                adj[v].add(u)
-    
-    final_adj = [list(s) for s in adj]
-    
-    actual_m = 0
-    for u_val in range(num_vars):
-        actual_m += len(final_adj[u_val])
-    actual_m //= 2
-
-   
-    return Instance(num_vars, actual_m, final_adj)
-
-
-def print_result(out, instance: Instance, result: Result):
+        num_vars, clauses = read_formula(filepath)
+    except ValueError as e:
+        sys.exit(f"Eroare la parsarea fișierului CNF '{filepath}': {e}")
+    return build_instance(num_vars, clauses)
+
+def build_instance(num_vars: int, clauses) -> Instance:
+    import numpy as np
+
+    by_length = {}
+    for clause in clauses:
+        if len(clause) > 1:
+            by_length.setdefault(len(clause), []).append(clause)
+
+    sources = [np.zeros(0, dtype=np.int64)]
+    targets = [np.zeros(0, dtype=np.int64)]
+    for length, group in by_length.items():
+        variables = np.abs(np.array(group, dtype=np.int64)) - 1
+        i, j = np.triu_indices(length, 1)
+        u, v = variables[:, i].ravel(), variables[:, j].ravel()
+        keep = u != v
+        sources += [u[keep], v[keep]]
+        targets += [v[keep], u[keep]]
+
+    keys = np.unique(np.concatenate(sources) * max(num_vars, 1) + np.concatenate(targets))
+    rows, indices = np.divmod(keys, max(num_vars, 1))
+    indptr = np.zeros(num_vars + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=num_vars), out=indptr[1:])
+
+    return Instance(num_vars, len(keys) // 2, indptr, indices)
+
+def result_to_canonical(result: Result, n: int, permutation) -> dict:
+    parents = [-1 for _ in range(n)]
+    for v in range(n):
+        p = result.parent(v)
+        parents[permutation[v + 1] - 1] = -1 if p == -1 else permutation[p + 1] - 1
+    return {"depth": result.depth(), "parents": parents}
+
+def result_from_canonical(entry: dict, n: int, permutation) -> Result:
+    inverse = {c: v for v, c in permutation.items()}
+    parents = []
+    for v in range(n):
+        p = entry["parents"][permutation[v + 1] - 1]
+        parents.append(-1 if p == -1 else inverse[p + 1] - 1)
+    return Result(entry["depth"], parents)
+
+def print_result(out, n: int, result: Result):
     if not isinstance(result, Result):
          sys.exit(f"Error: Invalid result type: {type(result)}")
 
-    print(result.depth())
-    for i in range(instance.vertex_number()):
+    print(result.depth(), file=out)
+    for i in range(n):
         parent_val = result.parent(i)
         if parent_val == -1:
-            print(0) 
+            print(0, file=out) 
         else:
-            print(parent_val + 1)
-
-def make_solver():
-    return Solver(name='Glucose4')
-
-def solve_limited_with_sat(instance: Instance, mi: int):
-    if instance.vertex_number() == 0:
-        return lambda: Result(0, [])
-
-    solver: Solver = make_solver()
+            print(parent_val + 1, file=out)
+    out.flush()
+
+def tree_depth(parents: List[int]) -> int:
+    depth = [0 for _ in parents]
+    best = 0
+    for v in range(len(parents)):
+        path = []
+        u = v
+        while u != -1 and depth[u] == 0:
+            path.append(u)
+            u = parents[u]
+        d = depth[u] if u != -1 else 0
+        for w in reversed(path):
+            d += 1
+            depth[w] = d
+        best = max(best, d)
+    return best
+
+def heuristic_elimination_tree(instance: Instance) -> Result:
     n: int = instance.vertex_number()
-    length: int = mi + 1
-
+    parents = [-1 for _ in range(n)]
+    removed = [False for _ in range(n)]
+    depth = 0
+
+    stack = [(list(instance.vertex_set()), -1, 0)]
+    while stack:
+        vertices, parent, level = stack.pop()
+        seen = set()
+        for start in vertices:
+            if removed[start] or start in seen:
+                continue
+            component = [start]
+            seen.add(start)
+            for v in component:
+                for u in instance.adj(v):
+                    if not removed[u] and u not in seen:
+                        seen.add(u)
+                        component.append(u)
+
+            root = max(component, key=lambda v: (sum(1 for u in instance.adj(v) if not removed[u]), -v))
+            parents[root] = parent
+            removed[root] = True
+            depth = max(depth, level + 1)
+            rest = [v for v in component if v != root]
+            if rest:
+                stack.append((rest, root, level + 1))
+
+    return Result(depth, parents)
+
+DEFAULT_BACKEND = "Glucose4"
+
+def make_solver(backend: str = DEFAULT_BACKEND):
+    return make_backend(backend)
+
+def flat_var_encoder(n: int, length: int):
     def flat_var(a: int, b: int, c: int) -> int:
         v1, v2 = min(a,b), max(a,b)
         return 1 + ((v1 * n + v2) * length + c)
+    return flat_var
 
-    for v_node in range(n):
-        for u_node in range(n):
-            for w_node in range(n):
-                for i in range(1, length):
-                    if v_node != u_node and u_node != w_node and v_node != w_node:
-                        solver.add_clause([-flat_var(v_node, u_node, i), -flat_var(u_node, w_node, i), flat_var(v_node, w_node, i)])
-                        solver.add_clause([-flat_var(v_node, w_node, i), -flat_var(w_node, u_node, i), flat_var(v_node, u_node, i)])
-                        solver.add_clause([-flat_var(u_node, v_node, i), -flat_var(v_node, w_node, i), flat_var(u_node, w_node, i)])
+def add_level_clauses(solver, instance: Instance, length: int, flat_var):
+    n: int = instance.vertex_number()
 
     for v_node in range(n):
         for u_node in range(v_node, n):
@@ -148,50 +212,99 @@ def solve_limited_with_sat(instance: Instance, mi: int):
             solver.add_clause([-flat_var(min_vu, min_vu, i), -flat_var(max_vu, max_vu, i),
                                flat_var(max_vu, max_vu, i - 1), flat_var(min_vu, max_vu, i)])
 
+def relation_levels(model: List[int], n: int, length: int):
+    import numpy as np
+
+    literals = np.asarray(model, dtype=np.int64)
+    values = np.zeros(n * n * length + 1, dtype=bool)
+    values[literals[(literals > 0) & (literals < len(values))]] = True
+    relation = values[1:].reshape(n, n, length) & np.triu(np.ones((n, n), dtype=bool))[:, :, None]
+    return relation | relation.transpose(1, 0, 2)
+
+def transitivity_violations(n: int, length: int, flat_var, relation) -> List[List[int]]:
+    import numpy as np
+
+    clauses = []
+    off_diagonal = ~np.eye(n, dtype=bool)
+    for i in range(1, length):
+        related = relation[:, :, i] & off_diagonal
+        for u_node in range(n):
+            neighbours = np.flatnonzero(related[u_node])
+            missing = ~related[np.ix_(neighbours, neighbours)]
+            for a, b in zip(*np.nonzero(np.triu(missing, 1))):
+                v_node, w_node = int(neighbours[a]), int(neighbours[b])
+                clauses.append([-flat_var(v_node, u_node, i), -flat_var(u_node, w_node, i), flat_var(v_node, w_node, i)])
+    return clauses
+
+def recover_result(n: int, mi: int, relation) -> Result:
+    import numpy as np
+
+    vertices = np.arange(n)
+    present = relation[vertices, vertices, 1:]
+    first_time = np.where(present.any(axis=1), present.argmax(axis=1) + 1, -1)
+
+    related = relation[vertices[:, None], vertices[None, :], first_time[:, None]]
+    candidate = related & (first_time[:, None] > first_time[None, :])
+    level = np.where(candidate, first_time[:, None], mi + 1)
+    parents = np.where(candidate.any(axis=0), level.argmin(axis=0), -1)
+    return Result(mi, parents.tolist())
+
+def solve_limited_with_sat(instance: Instance, mi: int, backend: str = DEFAULT_BACKEND):
+    if instance.vertex_number() == 0:
+        return lambda: Result(0, [])
+
+    solver = make_solver(backend)
+    n: int = instance.vertex_number()
+    length: int = mi + 1
+    flat_var = flat_var_encoder(n, length)
+
+    for v_node in range(n):
+        for u_node in range(n):
+            for w_node in range(n):
+                for i in range(1, length):
+                    if v_node != u_node and u_node != w_node and v_node != w_node:
+                        solver.add_clause([-flat_var(v_node, u_node, i), -flat_var(u_node, w_node, i), flat_var(v_node, w_node, i)])
+                        solver.add_clause([-flat_var(v_node, w_node, i), -flat_var(w_node, u_node, i), flat_var(v_node, u_node, i)])
+                        solver.add_clause([-flat_var(u_node, v_node, i), -flat_var(v_node, w_node, i), flat_var(u_node, w_node, i)])
+
+    add_level_clauses(solver, instance, length, flat_var)
+
     if not solver.solve():
         return None
 
-    true_set = set(filter(lambda x: x > 0, solver.get_model()))
-    
-    def recover():
-        first_time = [-1 for _ in range(n)]
-        for i_level_ft in range(length - 1, 0, -1): 
-            for v_node_ft in range(n):
-                if flat_var(v_node_ft, v_node_ft, i_level_ft) in true_set:
-                    if first_time[v_node_ft] == -1: 
-                        first_time[v_node_ft] = i_level_ft
-
-        parents = [-1 for _ in range(n)]
-        
-        sorted_nodes_to_process = sorted(enumerate(first_time), key=lambda x: (x[1], x[0]))
-
-        for v_node_idx, tm in sorted_nodes_to_process:
-            if tm == -1: 
-                continue
-            
-            if tm != -1 : 
-                for u_child_idx in range(n):
-                    if u_child_idx != v_node_idx and parents[u_child_idx] == -1:
-                        if first_time[u_child_idx] != -1 and first_time[u_child_idx] >= tm :
-                             if flat_var(v_node_idx, u_child_idx, first_time[u_child_idx]) in true_set: 
-                                parents[u_child_idx] = v_node_idx
-        
-        if n > 0 and parents.count(-1) == 0:
-            min_tm_val = n + 2 
-            root_candidate = -1
-            for idx_rt in range(n):
-                if first_time[idx_rt] != -1:
-                    if root_candidate == -1 or first_time[idx_rt] < min_tm_val:
-                        min_tm_val = first_time[idx_rt]
-                        root_candidate = idx_rt
-                    elif first_time[idx_rt] == min_tm_val and idx_rt < root_candidate: 
-                        root_candidate = idx_rt
-            if root_candidate != -1:
-                parents[root_candidate] = -1
-        return Result(mi, parents)
-    return recover
-
-def solve(instance: Instance) -> Result:
+    relation = relation_levels(solver.get_model(), n, length)
+    return lambda: recover_result(n, mi, relation)
+
+def solve_limited_with_lazy_sat(instance: Instance, mi: int, backend: str = DEFAULT_BACKEND):
+    if instance.vertex_number() == 0:
+        return lambda: Result(0, [])
+
+    solver = make_solver(backend)
+    n: int = instance.vertex_number()
+    length: int = mi + 1
+    flat_var = flat_var_encoder(n, length)
+
+    add_level_clauses(solver, instance, length, flat_var)
+
+    while True:
+        if not solver.solve():
+            return None
+        relation = relation_levels(solver.get_model(), n, length)
+        violated = transitivity_violations(n, length, flat_var, relation)
+        if not violated:
+            break
+        for clause in violated:
+            solver.add_clause(clause)
+
+    return lambda: recover_result(n, mi, relation)
+
+ENCODINGS = {
+    "flat": solve_limited_with_sat,
+    "lazy": solve_limited_with_lazy_sat,
+}
+
+def solve(instance: Instance, encoding: str = "flat", backend: str = DEFAULT_BACKEND) -> Result:
+    solve_limited = ENCODINGS[encoding]
     if instance.vertex_number() == 0:
         return Result(0, [])
     if instance.vertex_number() == 1:
@@ -205,7 +318,7 @@ def solve(instance: Instance) -> Result:
 
     while tries < max_hi_tries:
         tries += 1
-        current_recover = solve_limited_with_sat(instance, hi)
+        current_recover = solve_limited(instance, hi, backend)
         if current_recover:
             recover_func = current_recover
             break
@@ -218,7 +331,7 @@ def solve(instance: Instance) -> Result:
             elif target_hi <= lo : hi = target_hi 
             else: hi = target_hi
 
-            current_recover = solve_limited_with_sat(instance, hi)
+            current_recover = solve_limited(instance, hi, backend)
             if current_recover:
                 recover_func = current_recover
             break 
@@ -227,7 +340,7 @@ def solve(instance: Instance) -> Result:
             final_attempt_hi = instance.vertex_number() - 1
             if final_attempt_hi < 0: final_attempt_hi = 0
             if instance.vertex_number() > 0 and (tries >= max_hi_tries or hi != final_attempt_hi) :
-                 current_recover = solve_limited_with_sat(instance, final_attempt_hi)
+                 current_recover = solve_limited(instance, final_attempt_hi, backend)
                  if current_recover:
                      recover_func = current_recover
                      hi = final_attempt_hi 
@@ -240,7 +353,7 @@ def solve(instance: Instance) -> Result:
     final_hi = hi 
     
     if lo >= final_hi : 
-        final_solution_recover = solve_limited_with_sat(instance, final_hi)
+        final_solution_recover = solve_limited(instance, final_hi, backend)
         if final_solution_recover:
             return final_solution_recover()
         elif recover_func : 
@@ -254,14 +367,14 @@ def solve(instance: Instance) -> Result:
         if mi <= lo : mi = lo + 1 
         if mi >= final_hi : break      
 
-        rs_recover = solve_limited_with_sat(instance, mi)
+        rs_recover = solve_limited(instance, mi, backend)
         if rs_recover:
             final_hi = mi 
             recover_func = rs_recover
         else:
             lo = mi 
     
-    final_solution_recover = solve_limited_with_sat(instance, final_hi)
+    final_solution_recover = solve_limited(instance, final_hi, backend)
     if final_solution_recover:
         return final_solution_recover()
     elif recover_func: 
@@ -269,23 +382,105 @@ def solve(instance: Instance) -> Result:
 
     sys.exit("Error: Failed to recover final solution after binary search.")
 
-def main():
-    instance: Instance = None
-    input_filename = "test.cnf"
+def solve_anytime(instance: Instance, report, encoding: str = "flat", backend: str = DEFAULT_BACKEND) -> Result:
+    solve_limited = ENCODINGS[encoding]
+    if instance.vertex_number() <= 1:
+        best = solve(instance, encoding, backend)
+        report(best)
+        return best
 
+    best: Result = heuristic_elimination_tree(instance)
+    report(best)
+
+    while best.depth() > 1:
+        recover_func = solve_limited(instance, best.depth() - 1, backend)
+        if not recover_func:
+            break
+        candidate = recover_func()
+        parents = [candidate.parent(v) for v in instance.vertex_set()]
+        best = Result(tree_depth(parents), parents)
+        report(best)
+
+    return best
+
+def main(argv=None):
+    import argparse, time
+
+    parser = argparse.ArgumentParser(description="Treedepth of the primal graph of a CNF formula.")
+    parser.add_argument("filepath", nargs="?", default="test.cnf")
+    parser.add_argument("--anytime", action="store_true",
+                        help="print a heuristic decomposition first, then every improvement found")
+    parser.add_argument("--encoding", choices=sorted(ENCODINGS), default="flat",
+                        help="flat: all transitivity clauses up front; lazy: add them only when a model violates them")
+    parser.add_argument("--backend", default=DEFAULT_BACKEND,
+                        help="PySAT solver name (Glucose4, Cadical153, MapleChrono, ...), 'dpll', or 'ext:<command>' for a DIMACS solver reading stdin")
+    parser.add_argument("--benchmark", metavar="BACKEND,...",
+                        help="solve with each listed backend on the same encoding and report the time taken")
+    parser.add_argument("--cache", metavar="FILE",
+                        help="SQLite cache of results keyed by the canonical form of the formula")
+    parser.add_argument("--cache-rename", action="store_true",
+                        help="also match cached formulas that differ only by variable names (slower key computation)")
+    parser.add_argument("--cache-max-bytes", type=int, metavar="BYTES",
+                        help="size bound of the cache; least recently used entries are evicted (default 64 MiB)")
+    parser.add_argument("--cache-stats", action="store_true",
+                        help="print cache hit/miss statistics to stderr")
+    args = parser.parse_args(argv)
+
+    input_filename = args.filepath
 
     try:
-        instance = read_instance(input_filename)
+        num_vars, clauses = read_formula(input_filename)
     except FileNotFoundError:
         sys.exit(f"EROARE: Fișierul '{input_filename}' nu a fost găsit.")
     except Exception as e:
         sys.exit(f"EROARE la procesarea fișierului '{input_filename}': {e}")
 
+    cache = None
+    if args.cache and not args.benchmark:
+        from cache import CacheRezultate, DIMENSIUNE_MAXIMA_IMPLICITA, forma_canonica
+
+        cache = CacheRezultate(args.cache, args.cache_max_bytes or DIMENSIUNE_MAXIMA_IMPLICITA)
+        key, permutation = forma_canonica(clauses, num_vars, args.cache_rename)
+        entry = cache.cauta("treedepth", key)
+        if entry is not None:
+            print_result(sys.stdout, num_vars, result_from_canonical(entry, num_vars, permutation))
+            if args.cache_stats:
+                print(cache.raport(), file=sys.stderr)
+            cache.inchide()
+            return
+
+    for backend in (args.benchmark.split(",") if args.benchmark else [args.backend]):
+        check_backend(backend)
+
+    instance: Instance = None
+    try:
+        instance = build_instance(num_vars, clauses)
+    except Exception as e:
+        sys.exit(f"EROARE la procesarea fișierului '{input_filename}': {e}")
+
     if instance is None: 
         sys.exit("EROARE: Instanța nu a putut fi încărcată.")
 
-    result: Result = solve(instance)
-    print_result(sys.stdout, instance, result)
+    if args.benchmark:
+        for backend in args.benchmark.split(","):
+            start = time.perf_counter()
+            result: Result = solve(instance, args.encoding, backend)
+            print("{}\t{}\t{}\t{:.3f}s".format(backend, args.encoding, result.depth(), time.perf_counter() - start))
+        return
+
+    if args.anytime:
+        n = instance.vertex_number()
+        result: Result = solve_anytime(instance, lambda result: print_result(sys.stdout, n, result),
+                                       args.encoding, args.backend)
+    else:
+        result: Result = solve(instance, args.encoding, args.backend)
+        print_result(sys.stdout, instance.vertex_number(), result)
+
+    if cache:
+        cache.salveaza("treedepth", key, result_to_canonical(result, instance.vertex_number(), permutation))
+        if args.cache_stats:
+            print(cache.raport(), file=sys.stderr)
+        cache.inchide()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file